@@ -0,0 +1,375 @@
+"""
+Load generator for the Finance Dashboard API.
+
+Starts app.py locally with uvicorn (or targets an already running server via
+--url), replays a weighted mix of /dashboard, GET/POST /calculate and
+filter_by_date requests, and prints a JSON report with requests/sec,
+p50/p95/p99 latency and error rates.
+
+Examples:
+  python loadtest.py --concurrency 8 --duration 30
+  python loadtest.py --rate 20 --duration 60 --output baseline.json
+  python loadtest.py --url http://127.0.0.1:8000 --mix dashboard=1,filter_by_date=4
+"""
+import argparse
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+DEFAULT_MIX = "dashboard=1,calculate_get=2,calculate_post=2,filter_by_date=2"
+
+
+def build_scenarios(start_date, end_date, selected_date):
+    """Map scenario name -> (method, path, query params, json body)."""
+    return {
+        "dashboard": (
+            "POST", "/dashboard", None,
+            {"start_date": start_date, "end_date": end_date},
+        ),
+        "calculate_get": (
+            "GET", "/calculate",
+            {"function": "calculate_metrics", "start_date": start_date, "end_date": end_date},
+            None,
+        ),
+        "calculate_post": (
+            "POST", "/calculate", None,
+            {"function": "calculate_metrics",
+             "params": {"start_date": start_date, "end_date": end_date}},
+        ),
+        "filter_by_date": (
+            "GET", "/calculate",
+            {"function": "filter_by_date", "selected_date": selected_date},
+            None,
+        ),
+    }
+
+
+def parse_mix(mix, scenarios):
+    """Parse 'name=weight,...' into a list of (name, weight)."""
+    weights = []
+    for item in mix.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in scenarios:
+            raise ValueError(f"Unknown scenario '{name}'. Choose from: {', '.join(scenarios)}")
+        weight = float(weight) if weight else 1.0
+        if not math.isfinite(weight):
+            raise ValueError(f"Non-finite weight for scenario '{name}'.")
+        if weight < 0:
+            raise ValueError(f"Negative weight for scenario '{name}'.")
+        if weight > 0:
+            weights.append((name, weight))
+    if not weights:
+        raise ValueError("Request mix is empty.")
+    return weights
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, -(-len(sorted_values) * pct // 100))  # ceil
+    return sorted_values[int(rank) - 1]
+
+
+class Recorder:
+    """Thread-safe collector of (scenario, latency, status, ok) samples."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = []
+
+    def add(self, scenario, latency, status, ok):
+        with self._lock:
+            self.samples.append((scenario, latency, status, ok))
+
+
+class LoadRunner:
+    def __init__(self, base_url, scenarios, mix, timeout=60.0, seed=None):
+        self.base_url = base_url.rstrip("/")
+        self.scenarios = scenarios
+        self.names = [name for name, _ in mix]
+        self.weights = [weight for _, weight in mix]
+        self.timeout = timeout
+        self.random = random.Random(seed)
+        self._random_lock = threading.Lock()
+        self._local = threading.local()
+
+    def _session(self):
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        return session
+
+    def pick(self):
+        with self._random_lock:
+            return self.random.choices(self.names, weights=self.weights)[0]
+
+    def send(self, name, recorder, started=None):
+        """
+        Send one request for scenario `name` and record it.
+        `started` lets fixed-rate mode measure from the scheduled send time,
+        so queueing delay is included in the latency.
+        """
+        method, path, params, body = self.scenarios[name]
+        if started is None:
+            started = time.perf_counter()
+        status = None
+        ok = False
+        try:
+            response = self._session().request(
+                method, self.base_url + path, params=params, json=body, timeout=self.timeout
+            )
+            response.content  # make sure the whole body (serialization included) is read
+            status = response.status_code
+            ok = response.ok
+        except Exception as e:  # any failure counts as an error sample, never kills a worker
+            status = type(e).__name__
+        if recorder is not None:
+            recorder.add(name, time.perf_counter() - started, status, ok)
+
+    def run_closed(self, concurrency, duration, recorder, max_requests=None):
+        """Fixed concurrency: each worker sends back-to-back until the deadline."""
+        deadline = time.perf_counter() + duration
+        remaining = [max_requests]
+        lock = threading.Lock()
+
+        def take():
+            if remaining[0] is None:
+                return True
+            with lock:
+                if remaining[0] <= 0:
+                    return False
+                remaining[0] -= 1
+                return True
+
+        def worker():
+            while time.perf_counter() < deadline and take():
+                self.send(self.pick(), recorder)
+
+        threads = [threading.Thread(target=worker, daemon=True) for _ in range(concurrency)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    def run_open(self, rate, concurrency, duration, recorder, max_requests=None):
+        """Fixed rate: requests are scheduled every 1/rate seconds regardless of responses."""
+        interval = 1.0 / rate
+        begin = time.perf_counter()
+        deadline = begin + duration
+        sent = 0
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            while max_requests is None or sent < max_requests:
+                scheduled = begin + sent * interval
+                if scheduled >= deadline:
+                    break
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                pool.submit(self.send, self.pick(), recorder, scheduled)
+                sent += 1
+
+
+def summarize(samples, elapsed):
+    def stats(rows):
+        latencies = sorted(latency * 1000 for _, latency, _, _ in rows)
+        errors = sum(1 for *_, ok in rows if not ok)
+        count = len(rows)
+        return {
+            "requests": count,
+            "errors": errors,
+            "error_rate": errors / count if count else 0.0,
+            "requests_per_sec": count / elapsed if elapsed else 0.0,
+            "latency_ms": {
+                "mean": sum(latencies) / count if count else None,
+                "min": latencies[0] if latencies else None,
+                "p50": percentile(latencies, 50),
+                "p95": percentile(latencies, 95),
+                "p99": percentile(latencies, 99),
+                "max": latencies[-1] if latencies else None,
+            },
+            "status_codes": dict(Counter(str(status) for _, _, status, _ in rows)),
+        }
+
+    by_scenario = {}
+    for row in samples:
+        by_scenario.setdefault(row[0], []).append(row)
+
+    return {
+        "total": stats(samples),
+        "scenarios": {name: stats(rows) for name, rows in sorted(by_scenario.items())},
+    }
+
+
+READY_MESSAGE = "Finance Dashboard API is running!"
+
+
+def free_port(host):
+    """Ask the OS for a port that is currently free on `host`."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind((host, 0))
+        return sock.getsockname()[1]
+
+
+def is_ready(url):
+    """True if / answers with this app's welcome message."""
+    try:
+        response = requests.get(url + "/", timeout=1)
+        return response.ok and response.json().get("message") == READY_MESSAGE
+    except (requests.RequestException, ValueError, AttributeError):
+        return False
+
+
+def start_server(host, port, startup_timeout):
+    """Start app.py under uvicorn and wait until / answers."""
+    if port is None:
+        port = free_port(host)
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app:app",
+         "--host", host, "--port", str(port), "--log-level", "warning"],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        stdout=sys.stderr,  # keep stdout for the JSON report only
+    )
+    url = f"http://{host}:{port}"
+    deadline = time.perf_counter() + startup_timeout
+    while time.perf_counter() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited during startup with code {process.returncode}.")
+        # poll() again after the probe: if our child died (e.g. the port was
+        # taken), whatever answered is some other server.
+        if is_ready(url) and process.poll() is None:
+            return process, url
+        time.sleep(0.25)
+    stop_server(process)
+    raise RuntimeError(f"Server did not become ready within {startup_timeout}s.")
+
+
+def stop_server(process):
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the Finance Dashboard API.")
+    parser.add_argument("--url", help="Target an already running server instead of starting app.py.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, help="Port for the started app (default: a free port).")
+    parser.add_argument("--startup-timeout", type=float, default=120.0)
+    parser.add_argument("--concurrency", type=int, default=4,
+                        help="Workers in closed-loop mode; max in-flight requests with --rate.")
+    parser.add_argument("--rate", type=float,
+                        help="Requests/sec for open-loop (fixed rate) mode. Default: fixed concurrency.")
+    parser.add_argument("--duration", type=float, default=30.0, help="Measured seconds.")
+    parser.add_argument("--requests", type=int, help="Stop after this many measured requests.")
+    parser.add_argument("--warmup", type=float, default=0.0, help="Unmeasured seconds before the run.")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Weighted scenario mix (default: {DEFAULT_MIX}).")
+    parser.add_argument("--start-date", default="1404/01/01", help="Jalali start date for dashboard/metrics.")
+    parser.add_argument("--end-date", default="1404/01/31", help="Jalali end date for dashboard/metrics.")
+    parser.add_argument("--date", default="1404/01/15", help="Jalali date for filter_by_date.")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Per-request timeout in seconds.")
+    parser.add_argument("--seed", type=int, help="Seed for the scenario picker.")
+    parser.add_argument("--output", help="Also write the JSON report to this file.")
+    args = parser.parse_args(argv)
+
+    if args.concurrency < 1:
+        parser.error("--concurrency must be >= 1")
+    if args.rate is not None and args.rate <= 0:
+        parser.error("--rate must be > 0")
+    if args.duration <= 0:
+        parser.error("--duration must be > 0")
+    if args.requests is not None and args.requests < 1:
+        parser.error("--requests must be >= 1")
+    if args.warmup < 0:
+        parser.error("--warmup must be >= 0")
+    if args.timeout <= 0:
+        parser.error("--timeout must be > 0")
+    if args.startup_timeout <= 0:
+        parser.error("--startup-timeout must be > 0")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    scenarios = build_scenarios(args.start_date, args.end_date, args.date)
+    try:
+        mix = parse_mix(args.mix, scenarios)
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 2
+
+    process = None
+    if args.url:
+        base_url = args.url
+    else:
+        process, base_url = start_server(args.host, args.port, args.startup_timeout)
+
+    try:
+        runner = LoadRunner(base_url, scenarios, mix, timeout=args.timeout, seed=args.seed)
+
+        def run(duration, recorder, max_requests=None):
+            if args.rate:
+                runner.run_open(args.rate, args.concurrency, duration, recorder, max_requests)
+            else:
+                runner.run_closed(args.concurrency, duration, recorder, max_requests)
+
+        if args.warmup > 0:
+            run(args.warmup, None)
+
+        recorder = Recorder()
+        started = time.perf_counter()
+        run(args.duration, recorder, args.requests)
+        elapsed = time.perf_counter() - started
+    finally:
+        if process is not None:
+            stop_server(process)
+
+    if not recorder.samples:
+        print("❌ The measured run recorded no requests.", file=sys.stderr)
+        return 1
+
+    report = {
+        "config": {
+            "url": base_url,
+            "mode": "fixed_rate" if args.rate else "fixed_concurrency",
+            "rate": args.rate,
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "max_requests": args.requests,
+            "warmup": args.warmup,
+            "mix": dict(mix),
+            "start_date": args.start_date,
+            "end_date": args.end_date,
+            "date": args.date,
+        },
+        "elapsed_sec": elapsed,
+        **summarize(recorder.samples, elapsed),
+    }
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())